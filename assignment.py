@@ -24,15 +24,15 @@ Natalie Price-Jones, UofT, 2020
 
 
 # Add ability to accomodate different weekday frequency
-from docopt import docopt
 import warnings
 import calendar as cl
 import numpy as np
 import datetime as dt
-import copy
+from concurrent.futures import ThreadPoolExecutor
 
-fullnames = np.array(list(cl.day_name))
-abrnames = np.array(list(cl.day_abbr))
+# Weekday numbers keyed by full and abbreviated day names
+daynumbers = {name:i for i,name in enumerate(cl.day_name)}
+daynumbers.update({name:i for i,name in enumerate(cl.day_abbr)})
 
 def value_dist(arr,value):
     """
@@ -45,15 +45,56 @@ def value_dist(arr,value):
     Returns an array containing the distance to nearest instance of the 
     chosen value.
     """
-    mask_val = arr==value
-    idx_val = np.flatnonzero(mask_val)
-    idx_nval = np.flatnonzero(~mask_val)
-    if arr[-1]!=value:
-        idx_val = np.r_[idx_val,len(arr)]
-    out = np.zeros(len(arr),dtype=int)
-    idx = np.searchsorted(idx_val,idx_nval)
-    out[~mask_val]=idx_val[idx]-idx_nval
-    return out
+    positions = np.arange(len(arr))
+    # index of each instance of value, with the array length standing in
+    # for entries with no later instance
+    idx_val = np.where(arr==value,positions,len(arr))
+    # sweep from the end to find the next instance at or after each entry
+    idx_next = np.minimum.accumulate(idx_val[::-1])[::-1]
+    return idx_next-positions
+
+def sorted_in1d(sortedarr,values):
+    """
+    Test whether each entry of a sorted array is present in a second array.
+
+    sortedarr:  sorted numpy array of unique entries
+    values:     array of values to look for in sortedarr
+
+    Returns a boolean array the same length as sortedarr, True wherever the
+    entry appears in values.
+    """
+    values = np.asarray(values,dtype=sortedarr.dtype)
+    mask = np.zeros(len(sortedarr),dtype=bool)
+    if len(sortedarr)==0:
+        return mask
+    # binary search for each value, then keep only exact matches
+    idx = np.searchsorted(sortedarr,values)
+    valid = idx<len(sortedarr)
+    valid[valid] = sortedarr[idx[valid]]==values[valid]
+    mask[idx[valid]] = True
+    return mask
+
+def random_subset(arr,size,buffer=None):
+    """
+    Randomly choose entries from an array without replacement, shuffling
+    only as many entries as are chosen (a partial Fisher-Yates shuffle).
+
+    arr:     numpy array to choose from
+    size:    number of entries to choose, capped at the length of arr
+    buffer:  work array at least as long as arr, which can be reused between
+             calls to avoid allocation (default:None)
+
+    Returns an array of the chosen entries.
+    """
+    size = min(size,len(arr))
+    if buffer is None:
+        buffer = np.empty(len(arr),dtype=arr.dtype)
+    work = buffer[:len(arr)]
+    work[:] = arr
+    for i in range(size):
+        j = np.random.randint(i,len(arr))
+        work[i],work[j] = work[j],work[i]
+    return work[:size].copy()
 
 def read_constraints(fname: str,sep='=',comment='#'):
     """
@@ -70,24 +111,41 @@ def read_constraints(fname: str,sep='=',comment='#'):
     Returns a dictionary of constraint information.
     """
     with open(fname) as file:
-        contents = file.readlines()
+        contents = file.read()
     params = {}
-    for line in contents:
-        # scrub newlines and then remove comments
-        realtext = line.split('\n')[0].split(comment)[0]
+    for line in contents.splitlines():
+        # remove comments and surrounding whitespace
+        realtext = line.partition(comment)[0].strip()
         # for non-header lines, separate key and value
-        if realtext != '':
-            var = realtext.split(sep)
-            params[var[0]]=var[1]
+        if realtext:
+            key,_,value = realtext.partition(sep)
+            params[key]=value
     return params
 
+def parse_date(datestr: str,datesep='-'):
+    """
+    Convert a single date string to a numpy datetime64 with day precision.
+
+    Arguments
+    datestr:    String with a date given as year, month, day
+
+    Keyword arguments
+    datesep:    Character that separates parts of the date (default:'-')
+
+    Returns np.datetime64 object, raising ValueError for invalid dates.
+    """
+    year,month,day = datestr.split(datesep)
+    return np.datetime64(f'{int(year):04d}-{int(month):02d}-{int(day):02d}','D')
+
 def read_datelist(datestr: str,meetdates: np.array,sep=',',datesep='-',rangechar='()',
                   rangesep='_'):
     """
-    Separates a string list of dates into date objects, unpacking date ranges.
+    Separates a string list of dates into datetime64 objects, unpacking date
+    ranges.
     Arguments
     datestr:    String with list of dates
-    meetdates:  List of meetings given as dt.date objects
+    meetdates:  Array of meeting dates, sorted in increasing order so that
+                date ranges can be located by binary search
 
     Keyword arguments
     sep:        Character that separates entries in datestr (default:',')
@@ -97,31 +155,37 @@ def read_datelist(datestr: str,meetdates: np.array,sep=',',datesep='-',rangechar
                 (default:'_')
 
 
-    Returns list of date objects, with ranges presented as tuples.
+    Returns array of datetime64 dates, with ranges replaced by the meeting dates
+    they contain.
     """
+    meetdates = np.asarray(meetdates,dtype='datetime64[D]')
     dates = datestr.split(sep)
     datelist=[]
+    starts=[]
+    ends=[]
     for date in dates:
         try:
             if rangechar[0] in date:
                 start = date.split(rangesep)[0].split(rangechar[0])[1]
-                year,month,day = start.split(datesep)
-                start = dt.date(int(year),int(month),int(day))
+                start = parse_date(start,datesep=datesep)
                 end = date.split(rangesep)[1].split(rangechar[1])[0]
-                year,month,day = end.split(datesep)
-                end = dt.date(int(year),int(month),int(day))
+                end = parse_date(end,datesep=datesep)
                 if start==end:
                     warnings.warn(f'start {start} == end {end} in date range')
                 else:
-                    intervalmeetings = meetdates[(meetdates>=start)&(meetdates<=end)]
-                    datelist.append(intervalmeetings)
+                    starts.append(start)
+                    ends.append(end)
             else:
-                year,month,day = date.split(datesep)
-                datelist.append([dt.date(int(year),int(month),int(day))])
+                datelist.append(parse_date(date,datesep=datesep))
         except ValueError:
             warnings.warn(f'Invalid date format in {date}, skipping')
-    datelist = [item for sublist in datelist for item in sublist]
-    return np.array(datelist)
+    # meetdates is sorted, so each range is a contiguous slice whose bounds
+    # are found for all ranges at once
+    lo = np.searchsorted(meetdates,np.array(starts,dtype='datetime64[D]'),side='left')
+    hi = np.searchsorted(meetdates,np.array(ends,dtype='datetime64[D]'),side='right')
+    datelist = [np.array(datelist,dtype='datetime64[D]')]
+    datelist += [meetdates[l:h] for l,h in zip(lo,hi)]
+    return np.concatenate(datelist)
 
 class participant(object):
     """
@@ -130,7 +194,7 @@ class participant(object):
     Last modified: Price-Jones, 2020
     Created: Price-Jones, 2020
     """
-    def __init__(self,fname: str,ext='.txt', **kwargs):
+    def __init__(self,fname: str,ext='.txt',details=None,**kwargs):
         """
         Read in participant properties.
 
@@ -138,7 +202,9 @@ class participant(object):
         fname:  Name of participant file
 
         Keyword arguments
-        ext:    Participant file extension (default:'.txt')
+        ext:     Participant file extension (default:'.txt')
+        details: Dictionary of already read participant constraints; if
+                 given, the participant file is not read (default:None)
 
         Additional keyword arguments are passed to read_constraints
 
@@ -146,7 +212,8 @@ class participant(object):
 
         """
         fname = fname+ext
-        details = read_constraints(fname,**kwargs)
+        if details is None:
+            details = read_constraints(fname,**kwargs)
         self.name = details['NAME']
         if self.name=='':
             warnings.warn(f'I got an empty name for {fname}, defaulting to file name.')
@@ -172,6 +239,21 @@ class participant(object):
         self.forbid = details['FORBID']
         self.force = details['FORCE']
 
+    def set_dates(self,meetdates: np.array,**kwargs):
+        """
+        Convert forbidden and forced date strings into meeting dates, so
+        they only need to be parsed once per schedule.
+
+        Arguments
+        meetdates:  Sorted array of meeting dates
+
+        Additional keyword arguments are passed to read_datelist
+
+        Returns None
+        """
+        self.forbid_dates = read_datelist(self.forbid,meetdates,**kwargs)
+        self.force_dates = read_datelist(self.force,meetdates,**kwargs)
+
 class schedule(object):
     """
     Class to perform scheduling over a fixed date range.
@@ -193,16 +275,12 @@ class schedule(object):
         self.start=start
         self.end=end
         self.weekdays = []
-        # Create date objects for the weekdays of the meetings
+        # Convert the weekdays of the meetings to weekday numbers
         for day in weekdays:
-            day = day.strip().capitalize()
             if isinstance(day,str):
-                if day in fullnames:
-                    match = np.where(fullnames==day)[0][0]
-                    self.weekdays.append(match)
-                elif day in abrnames:
-                    match = np.where(fullnames==day)[0][0]
-                    self.weekdays.append(match)
+                day = day.strip().capitalize()
+                if day in daynumbers:
+                    self.weekdays.append(daynumbers[day])
                 else:
                     warnings.warn('Invalid meeting day given. \
                                    Assuming today is a meeting day.')
@@ -219,7 +297,7 @@ class schedule(object):
         meetdates = self.get_meetdates()
         # Get forbidden meeting days (even if forbid is just range)
         self.forbid=read_datelist(forbid,meetdates,**kwargs)
-        self.meetdates = meetdates[np.invert(np.in1d(meetdates,self.forbid))]
+        self.meetdates = meetdates[np.invert(sorted_in1d(meetdates,self.forbid))]
         self.people_list = people_list
         self.seed=seed
         # Get participants and their constraints
@@ -227,8 +305,13 @@ class schedule(object):
         self.names = []
         self.npresenters=0
         self.nnoters=0
+        # Read participant files in parallel, since this is waiting on I/O
+        fnames = [person+'.txt' for person in self.people_list]
+        with ThreadPoolExecutor(max_workers=max(1,min(32,len(fnames)))) as pool:
+            alldetails = list(pool.map(read_constraints,fnames))
         for p,person in enumerate(self.people_list):
-            particip=participant(person)
+            particip=participant(person,details=alldetails[p])
+            particip.set_dates(self.meetdates,**kwargs)
             self.people[person]=particip
             self.names.append(particip.name)
             if particip.talk:
@@ -248,40 +331,30 @@ class schedule(object):
         freq:           number of weeks between subsequent meetings
         datesep:        separater in the datestring
 
-        Returns list of valid date objects for meetings.
+        Returns sorted array of valid meeting dates as datetime64.
 
         """
         # If start, end, weekdays, or freq unspecified, use defaults from class
         if not start:
-            start = self.start
-            year,month,day = start.split(datesep)
-            start = dt.date(int(year),int(month),int(day))
+            start = parse_date(self.start,datesep=datesep)
         if not end:
-            end = self.end
-            year,month,day = end.split(datesep)
-            end = dt.date(int(year),int(month),int(day))
+            end = parse_date(self.end,datesep=datesep)
         if not weekdays:
             weekdays = self.weekdays
         if not freq:
             freq = self.freq
-        # Create holder for meeting dates
-        meetdates = np.empty((1,len(weekdays)),dtype=dt.date)
-        for d,day in enumerate(weekdays):
-            if start.weekday() in weekdays:
-                meetdates[d] = start
-            elif start.weekday() not in weekdays:
-                # Calculate how far we are from the first meeting
-                ndays_away = (day - start.weekday())%7
-                days_delta = dt.timedelta(days=int(ndays_away))
-                meetdates[d] = start+days_delta
-        # Add meeting dates until you hit the end date
-        while np.max(meetdates)<end:
-            meetdates = np.append(meetdates,
-                                  meetdates[-1]+dt.timedelta(days=freq*7))
-        meetdates = meetdates.flatten()
-        # Double check to force only dates in the range
-        meetdates = meetdates[meetdates <= end]
-        meetdates = np.sort(meetdates)
+        start = np.datetime64(start,'D')
+        end = np.datetime64(end,'D')
+        # 1970-01-05 was a Monday, so this gives weekday numbers from 0-6
+        start_weekday = (start-np.datetime64('1970-01-05','D')).astype(int)%7
+        step = np.timedelta64(7*int(freq),'D')
+        # Calculate how far we are from the first meeting on each weekday
+        ndays_away = (np.asarray(weekdays,dtype=int)-start_weekday)%7
+        firsts = start+ndays_away.astype('timedelta64[D]')
+        # Step every weekday forward together, then keep dates in the range
+        nsteps = np.arange((end-start)//step+1)
+        meetdates = (firsts[:,None]+nsteps[None,:]*step).ravel()
+        meetdates = np.unique(meetdates[meetdates<=end])
         return meetdates
 
 
@@ -315,97 +388,98 @@ class schedule(object):
         # Calculate the maximum number of times any given person should present
         pmax = np.ceil(len(self.meetdates)*npresent/self.npresenters)
         nmax = np.ceil(len(self.meetdates)*nnote/self.nnoters)
-        # Store input availabilities so you can update them to avoid repeats
-        masterpavail = pavail
-        masternavail = navail
+        # Store copies of the input availabilities, so the fallback below can
+        # still see them after the padding updates
+        masterpavail = pavail.copy()
+        masternavail = navail.copy()
+        # Running totals of assignments, starting from any required dates
+        pcount = np.sum(pstatus,axis=0,dtype=int)
+        ncount = np.sum(nstatus,axis=0,dtype=int)
+        # Scratch space for random selection, reused for every date
+        buffer = np.empty(len(self.people_list),dtype=np.int32)
 
         # Cycle through all dates to find presenters first
         for d,date in enumerate(pstatus):
+            # Calculate the number of presenters needed
+            remaining = npresent-int(date.sum())
             # First check whether more presenters are needed
-            if np.sum(date)<npresent:
-                # Calculate the number of presenters needed
-                remaining = int(npresent-np.sum(date))
+            if remaining>0:
                 # Determine who's available
-                available = np.arange(len(date),dtype=int)[pavail[d]==0]
+                available = np.flatnonzero(pavail[d]==0)
                 # If not enough people are available (because of repetition
                 # restrictions), shake things up
-                if available.size<npresent:
+                if available.size<remaining:
                     # Find everyone who could conceivably present
-                    possavail = np.arange(len(date),dtype=int)[masterpavail[d]==0]
-                    newavail = []
-                    for a,avail in enumerate(possavail):
-                        # Determine the interval to last presentation
-                        inters = np.fabs(d-np.where(pstatus[:,avail]==1)[0])
-                        if np.sum(inters<=interval)==0:
-                            newavail.append(avail)
-                    newavail=np.array(newavail)
+                    possavail = np.flatnonzero(masterpavail[d]==0)
+                    # Keep only those with no presentation within the interval
+                    window = pstatus[max(0,d-interval):d+interval+1]
+                    newavail = possavail[~window[:,possavail].any(axis=0)]
+                    if newavail.size<remaining:
+                        warnings.warn(f'Only found {newavail.size} of {remaining} \
+                                        remaining presenters for {self.meetdates[d]}')
+                    chosen = random_subset(newavail,remaining,buffer)
                 # If people are available, select them randomly
-                elif available.size>=npresent:
-                    chosen = np.random.choice(available,size=remaining,replace=False)
+                else:
+                    chosen = random_subset(available,remaining,buffer)
                 # Update the chosen presenters' status to presenting
                 pstatus[d][chosen]=1
+                pcount[chosen]+=1
                 # Pad to ensure that there won't be repeat presentations
-                padb = np.max([0,d-interval])
-                padt = np.min([d+interval+1,len(pstatus)])
-                padinds = np.arange(padb,padt)
-                for p,pad in enumerate(padinds):
-                    for c,choice in enumerate(chosen):
-                        if pavail[pad][choice]!=1:
-                            pavail[pad][choice]=-1
+                padb = max(0,d-interval)
+                padt = min(d+interval+1,len(pstatus))
+                padblock = pavail[padb:padt][:,chosen]
+                padblock[padblock!=1] = -1
+                pavail[padb:padt,chosen] = padblock
                 # Update their availability and recuse them from notetaking
                 pavail[d][chosen]=1
                 navail[d][chosen]=-1
                 # If anyone has already presented the max number of times,
                 # make them unavailable (this does not override requested dates)
-                reqsmet = np.where(np.sum(pstatus,axis=0)>=pmax)[0]
-                datesleft = np.arange(len(self.meetdates))[d+1:]
-                for r,remain in enumerate(datesleft):
-                    for p,person in enumerate(reqsmet):
-                        if pavail[remain][person]!=1:
-                            pavail[remain][person]=-1
+                reqsmet = np.flatnonzero(pcount>=pmax)
+                leftblock = pavail[d+1:,reqsmet]
+                leftblock[leftblock!=1] = -1
+                pavail[d+1:,reqsmet] = leftblock
 
         # Similar to above but for notetaking - note its not identical, as the 
         # loop above updates the the notetaker availability used in this loop
         for d,date in enumerate(nstatus):
+            # Calculate the number of missing notetakers
+            remaining = nnote-int(date.sum())
             # Check whether more notetakers are needed
-            if np.sum(date)<nnote:
-                # Calculate the number of missing notetakers
-                remaining = int(nnote-np.sum(date))
-                available = np.arange(len(date))[navail[d]==0]
+            if remaining>0:
+                available = np.flatnonzero(navail[d]==0)
                 # If there aren't enough notetakers, shake things up
-                if available.size<nnote:
-                    possavail = np.arange(len(date),dtype=int)[masternavail[d]==0]
-                    newavail = []
-                    for a,avail in enumerate(possavail):
-                        inters = np.fabs(d-np.where(nstatus[:,avail]==1)[0])
-                        if np.sum(inters<=interval)==0:
-                            newavail.append(avail)
-                    newavail=np.array(newavail)
+                if available.size<remaining:
+                    # Exclude anyone presenting at this meeting
+                    possavail = np.flatnonzero((masternavail[d]==0)&(pstatus[d]==0))
+                    window = nstatus[max(0,d-interval):d+interval+1]
+                    newavail = possavail[~window[:,possavail].any(axis=0)]
+                    if newavail.size<remaining:
+                        warnings.warn(f'Only found {newavail.size} of {remaining} \
+                                        remaining notetakers for {self.meetdates[d]}')
+                    chosen = random_subset(newavail,remaining,buffer)
                 # If there are enough notetakers, choose randomly
-                elif available.size>=nnote:
-                    chosen = np.random.choice(available,size=remaining,replace=False)
+                else:
+                    chosen = random_subset(available,remaining,buffer)
                 # Update selected notetakers status
                 nstatus[d][chosen]=1
+                ncount[chosen]+=1
                 # Pad status to avoid repeated notetakers
-                padb = np.max([0,d-interval])
-                padt = np.min([d+interval+1,len(pstatus)])
-                padinds = np.arange(padb,padt)
-                for p,pad in enumerate(padinds):
-                    for c,choice in enumerate(chosen):
-                        if navail[pad][choice]!=1:
-                            navail[pad][choice]=-1
+                padb = max(0,d-interval)
+                padt = min(d+interval+1,len(pstatus))
+                padblock = navail[padb:padt][:,chosen]
+                padblock[padblock!=1] = -1
+                navail[padb:padt,chosen] = padblock
                 # Update availability
                 navail[d][chosen]=1
-                reqsmet = np.where(np.sum(nstatus,axis=0)>=pmax)[0]
-                datesleft = np.arange(len(self.meetdates))[d+1:]
-                for r,remain in enumerate(datesleft):
-                    for p,person in enumerate(reqsmet):
-                        if navail[remain][person]!=1:
-                            navail[remain][person]=-1
+                reqsmet = np.flatnonzero(ncount>=pmax)
+                leftblock = navail[d+1:,reqsmet]
+                leftblock[leftblock!=1] = -1
+                navail[d+1:,reqsmet] = leftblock
         return pstatus,nstatus
 
 
-    def populate_schedule(self,npresent=2,nnote=2,interval=2,**kwargs):
+    def populate_schedule(self,npresent=2,nnote=2,interval=2):
         """
         Creates matrices to summarize the availability of all participants
         for notetaking and presenting.
@@ -426,30 +500,26 @@ class schedule(object):
         #  1    =   required
         #  0    =   available 
         # -1    =   not available
-        pavail = np.zeros((len(self.meetdates),len(self.people_list)),dtype=int)
-        navail = np.zeros((len(self.meetdates),len(self.people_list)),dtype=int)
+        # so they are stored as int8 to keep the scheduling loops compact
+        pavail = np.zeros((len(self.meetdates),len(self.people_list)),dtype=np.int8)
+        navail = np.zeros((len(self.meetdates),len(self.people_list)),dtype=np.int8)
 
         # Check each person for dates they cannot present and must present.
         # Update their availability accordingly, then make sure they will not
         # present too soon after one of their required dates.
         for p,person in enumerate(self.people_list):
-            forbidden = read_datelist(self.people[person].forbid,
-                                      self.meetdates,**kwargs)
-            forced =  read_datelist(self.people[person].force,
-                                    self.meetdates,**kwargs)
-            badmeets = np.in1d(self.meetdates,forbidden)
-            goodmeets = np.in1d(self.meetdates,forced)
-            padded_badmeets = badmeets
-            forced_meets = np.where(goodmeets)[0]
-            # Add forbidden dates adjacent to required presentations
-            for f,force in enumerate(forced_meets):
-                start = np.max([0,force-interval])
-                end = np.min([force+interval+1,len(self.meetdates)])
-                padded_badmeets[start:end]=True
+            badmeets = sorted_in1d(self.meetdates,self.people[person].forbid_dates)
+            goodmeets = sorted_in1d(self.meetdates,self.people[person].force_dates)
+            # Add forbidden dates adjacent to required presentations by
+            # shifting the required dates up to interval meetings either way
+            padded_badmeets = badmeets|goodmeets
+            for shift in range(1,interval+1):
+                padded_badmeets[shift:] |= goodmeets[:-shift]
+                padded_badmeets[:-shift] |= goodmeets[shift:]
             # Add flags for presenting
             if self.people[person].talk:
                 # Note that this ordering means force will always override interval padding
-                pavail[:,p][badmeets] = -1
+                pavail[:,p][padded_badmeets] = -1
                 pavail[:,p][goodmeets] = 1
             elif not self.people[person].talk:
                 pavail[:,p] = -1
@@ -461,9 +531,12 @@ class schedule(object):
             elif not self.people[person].notes:
                 navail[:,p] = -1
 
-        # Initialize status arrays
-        pstatus = np.zeros((len(self.meetdates),len(self.people_list)),dtype=int)
-        nstatus = np.zeros((len(self.meetdates),len(self.people_list)),dtype=int)
+        # Initialize status arrays, column-major so that each person's history
+        # is contiguous for the interval checks in random_assignment
+        pstatus = np.zeros((len(self.meetdates),len(self.people_list)),dtype=np.int8,
+                           order='F')
+        nstatus = np.zeros((len(self.meetdates),len(self.people_list)),dtype=np.int8,
+                           order='F')
 
         # Update status arrays to accomodate dates with required presenters
         pstatus[pavail==1] = 1
@@ -482,27 +555,29 @@ class schedule(object):
         Return None.
         """
         fname = f'schedule_{self.start}_{self.end}.txt'
+        # Collect all lines first so the schedule is written out in one go
+        lines = []
+        for d,date in enumerate(self.meetdates):
+            presenters = self.names[self.pstatus[d]==1]
+            noters = self.names[self.nstatus[d]==1]
+            lines.append(f'{date}\npresenters:{presenters.tolist()}\nnotetakers:{noters.tolist()}')
+        ptotals = np.sum(self.pstatus,axis=0,dtype=int)
+        ntotals = np.sum(self.nstatus,axis=0,dtype=int)
+
+        # Add overall stats
+        for p,person in enumerate(self.people_list):
+            lines.append(f'{self.names[p]} presented {ptotals[p]} times, took notes {ntotals[p]} times')
+        output = '\n'.join(lines)
+        print(output)
         with open(fname,'w') as f:
-            for d,date in enumerate(self.meetdates):
-                presenters = self.names[self.pstatus[d]==1]
-                noters = self.names[self.nstatus[d]==1]
-                dateinfo = f'{date}\npresenters:{[p for p in presenters]}\nnotetakers:{[n for n in noters]}'
-                f.write(dateinfo+'\n')
-                print(dateinfo)
-            ptotals = np.sum(self.pstatus,axis=0)
-            ntotals = np.sum(self.nstatus,axis=0)
-
-            # Print overall stats
-            for p,person in enumerate(self.people_list):
-                statinfo = f'{self.names[p]} presented {ptotals[p]} times, took notes {ntotals[p]} times'
-                f.write(statinfo+'\n')
-                print(statinfo)
-            f.close()
+            f.write(output+'\n')
 
 
 
 if __name__=='__main__':
 
+    # Only the command line interface needs docopt
+    from docopt import docopt
     arguments = docopt(__doc__)
     start = arguments['--start']
     end = arguments['--end']
@@ -522,13 +597,13 @@ if __name__=='__main__':
             start = constraints['START'].strip()
         except KeyError:
             warnings.warn('No start date specified, assuming today is start date')
-            start = dt.date.today()
+            start = str(np.datetime64('today','D'))
     if end=='None':
         try:
             end = constraints['END'].strip()
         except KeyError:
             warnings.warn('No end date specified, producing results for one month')
-            end = dt.date.today()+dt.timedelta(days=30)
+            end = str(np.datetime64('today','D')+30)
 
     if weekdays=='None':
         try: